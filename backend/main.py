@@ -3,45 +3,222 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import asyncio
-import json
+import atexit
+import fractions
+import hashlib
+import io
 import os
-import base64
 import logging
+import queue
+import re
+import urllib.request
+from contextlib import asynccontextmanager
+import zipfile
+from logging.handlers import QueueHandler, QueueListener
 from datetime import datetime
 from dotenv import load_dotenv
 from websockets import connect
-from typing import Dict
+from websockets.exceptions import ConnectionClosed
+from typing import Dict, Optional, Tuple, Union
 from pathlib import Path
 import numpy as np
-import torch
+import orjson
+import msgspec
+import onnxruntime as ort
 from scipy import signal
 
 from google.genai.types import GenerateContentConfig
 
+try:
+    # SIMD-accelerated codec with the same API as the stdlib base64 module
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    import uvloop
+    # libuv-backed event loop for every endpoint (uvloop is not available on Windows)
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 load_dotenv()
 
-# Configure logging
+# Configure logging: records are queued and written by a background listener thread,
+# so file/console I/O (including tracebacks) never blocks the event loop
+log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+log_handlers = [
+    logging.FileHandler('sahay_backend.log'),
+    logging.StreamHandler()
+]
+for handler in log_handlers:
+    handler.setFormatter(log_formatter)
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *log_handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('sahay_backend.log'),
-        logging.StreamHandler()
-    ]
+    format='%(message)s',  # The listener's handlers apply the real format
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the shared VAD (model download, ORT session, warm-up) before serving, off the
+    # event loop, rather than at import time
+    await asyncio.get_running_loop().run_in_executor(None, get_vad)
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+# Packets quieter than this (normalized RMS) are treated as silence without running the VAD model
+NOISE_FLOOR_RMS = 0.002
+
+def reserve_float32(buffer: np.ndarray, size: int) -> np.ndarray:
+    """Return a float32 scratch buffer holding at least `size` samples, reusing `buffer` when it fits"""
+    if len(buffer) >= size:
+        return buffer
+    return np.empty(size, dtype=np.float32)
+
+def pcm16_to_float32(audio_np: np.ndarray, buffer: np.ndarray) -> np.ndarray:
+    """Scale int16 PCM to [-1, 1) in a single pass into a preallocated float32 buffer"""
+    audio_float = buffer[:len(audio_np)]
+    np.multiply(audio_np, np.float32(1 / 32768.0), out=audio_float)
+    return audio_float
+
+def rms_level(audio_float: np.ndarray) -> float:
+    """RMS level of normalized audio using a single BLAS dot product"""
+    return float(np.sqrt(np.dot(audio_float, audio_float) / len(audio_float)))
+
+# The common Gemini frame: a model turn holding exactly one inline audio part and nothing else.
+# Anything that doesn't match this shape exactly (text, turnComplete, extra keys) is fully parsed.
+AUDIO_FRAME_HEAD = (
+    r'\s*\{\s*"serverContent"\s*:\s*\{\s*"modelTurn"\s*:\s*\{\s*"parts"\s*:\s*\[\s*'
+    r'\{\s*"inlineData"\s*:\s*\{\s*"mimeType"\s*:\s*"([^"\\]*)"\s*,\s*"data"\s*:\s*"'
+)
+AUDIO_FRAME_TAIL = r'"\s*\}\s*\}\s*\]\s*\}\s*\}\s*\}\s*'
+AUDIO_FRAME_PATTERNS = {
+    str: (re.compile(AUDIO_FRAME_HEAD), re.compile(AUDIO_FRAME_TAIL), '"'),
+    bytes: (re.compile(AUDIO_FRAME_HEAD.encode()), re.compile(AUDIO_FRAME_TAIL.encode()), b'"'),
+}
+
+def match_audio_frame(msg: Union[str, bytes]) -> Optional[Tuple[str, Union[str, memoryview]]]:
+    """(mimeType, base64 data) of an audio-only Gemini frame, sliced out without building the JSON tree
+
+    For binary (bytes) frames the data is a zero-copy memoryview into the message.
+    """
+    patterns = AUDIO_FRAME_PATTERNS.get(type(msg))
+    if patterns is None:
+        return None
+    head, tail, quote = patterns
+    match = head.match(msg)
+    if match is None:
+        return None
+    # Base64 never contains quotes or escapes, so the payload ends at the next quote
+    start = match.end()
+    end = msg.find(quote, start)
+    if end < 0 or not tail.fullmatch(msg, end):
+        return None
+    if isinstance(msg, bytes):
+        return match.group(1).decode(), memoryview(msg)[start:end]
+    return match.group(1), msg[start:end]
+
+# Frames sent to the browser; each struct's tag is emitted as its "type" field
+class AudioStartFrame(msgspec.Struct, tag_field="type", tag="audio_start"):
+    mimeType: str
+    sampleRate: int
+
+class TextFrame(msgspec.Struct, tag_field="type", tag="text"):
+    text: str
+
+class StatusFrame(msgspec.Struct, tag_field="type", tag="status", omit_defaults=True):
+    status: str
+    text: Optional[str] = None
+
+class ErrorFrame(msgspec.Struct, tag_field="type", tag="error"):
+    text: str
+
+FRAME_ENCODER = msgspec.json.Encoder()
+
+async def send_frame(websocket: WebSocket, frame: msgspec.Struct):
+    """Send a frame struct as a JSON text frame (binary frames are left for raw audio)"""
+    await websocket.send_text(FRAME_ENCODER.encode(frame).decode())
+
+SAMPLE_RATE_PATTERN = re.compile(r"rate=(\d+)")
+
+async def forward_audio(websocket: WebSocket, awaaz: "AwaazConnection", audio_data_b64: Union[str, memoryview], mime_type: str):
+    """Send Gemini audio to the browser as raw PCM in a binary frame
+
+    Binary frames carry no metadata, so an audio_start frame announces the format whenever
+    it differs from the current turn's (normally once per turn).
+    """
+    if mime_type != awaaz.output_mime_type:
+        rate = SAMPLE_RATE_PATTERN.search(mime_type)
+        await send_frame(websocket, AudioStartFrame(mimeType=mime_type, sampleRate=int(rate.group(1)) if rate else 24000))
+        awaaz.output_mime_type = mime_type
+    await websocket.send_bytes(base64.b64decode(audio_data_b64))
+
+# The model is taken from the pinned silero-vad 6.2.3 release wheel (an immutable PyPI file)
+# and checked against its known digest, so upstream changes can't alter its I/O signature
+SILERO_VAD_WHEEL_URL = ("https://files.pythonhosted.org/packages/84/ef/"
+                        "9099037ed6f180ea33220178df4107112c0ce2bf5fb4d6f6ab19db2844ed/"
+                        "silero_vad-6.2.3-py3-none-any.whl")
+SILERO_VAD_WHEEL_MEMBER = "silero_vad/data/silero_vad.onnx"
+SILERO_VAD_ONNX_SHA256 = "1a153a22f4509e292a94e67d6f9b85e8deb25b4988682b7e174c65279d8788e3"
+SILERO_VAD_DOWNLOAD_TIMEOUT = 30  # seconds without progress before the download is abandoned
+
+def silero_vad_onnx_path() -> Path:
+    """Local path of the Silero VAD ONNX model (SILERO_VAD_ONNX, or downloaded once into the user cache)"""
+    configured = os.environ.get("SILERO_VAD_ONNX")
+    if configured:
+        return Path(configured)
+    path = Path.home() / ".cache" / "silero-vad" / "silero_vad-6.2.3.onnx"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Downloading Silero VAD model to {path}")
+        with urllib.request.urlopen(SILERO_VAD_WHEEL_URL, timeout=SILERO_VAD_DOWNLOAD_TIMEOUT) as response:
+            wheel = response.read()
+        with zipfile.ZipFile(io.BytesIO(wheel)) as archive:
+            model = archive.read(SILERO_VAD_WHEEL_MEMBER)
+        digest = hashlib.sha256(model).hexdigest()
+        if digest != SILERO_VAD_ONNX_SHA256:
+            raise RuntimeError(f"Silero VAD model checksum mismatch: {digest}")
+        tmp = path.with_suffix(".part")
+        tmp.write_bytes(model)
+        tmp.replace(path)
+    return path
+
+# Silero scores 512-sample frames at 16 kHz, each preceded by the last 64 samples of the
+# stream's previous frame (as its reference OnnxWrapper does); without that context the
+# ONNX model returns near-zero probabilities for real speech
+VAD_FRAME_SAMPLES = 512
+VAD_CONTEXT_SAMPLES = 64
 
 # Voice Activity Detector
 class VoiceActivityDetector:
-    def __init__(self):
+    def __init__(self, max_batch: int = 16, batch_window: float = 0.005):
+        # Frames arriving within batch_window seconds share one (B, 64 + 512) forward pass
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._pending = []
+        self._flush_handle = None
+        self._f32 = np.empty(4096, dtype=np.float32)
+        # Persistent model input; each row is [stream context | frame], copied straight in
+        self._vad_in = np.zeros((max_batch, VAD_CONTEXT_SAMPLES + VAD_FRAME_SAMPLES), dtype=np.float32)
         try:
-            self.model, _ = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                         model='silero_vad',
-                                         force_reload=False)
-            self.model.eval()
+            options = ort.SessionOptions()
+            # Single-frame inference is latency bound; extra threads only add wake-up overhead
+            options.intra_op_num_threads = 1
+            options.inter_op_num_threads = 1
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.model = ort.InferenceSession(str(silero_vad_onnx_path()), options,
+                                              providers=["CPUExecutionProvider"])
             self.target_sample_rate = 16000
+            self._sr = np.array(self.target_sample_rate, dtype=np.int64)
+            self._resample_ratios = {}
+            self._warmup()
             self.is_initialized = True
             logger.info("VAD model loaded successfully")
         except Exception as e:
@@ -49,69 +226,142 @@ class VoiceActivityDetector:
             self.model = None
             self.is_initialized = False
 
+    @staticmethod
+    def new_state() -> Tuple[np.ndarray, np.ndarray]:
+        """Fresh (recurrent state, context) for one audio stream; each connection keeps its own"""
+        return (np.zeros((2, 1, 128), dtype=np.float32),
+                np.zeros((1, VAD_CONTEXT_SAMPLES), dtype=np.float32))
+
+    def _warmup(self):
+        """Run one dummy frame so session setup doesn't land on the first user packet"""
+        state, _ = self.new_state()
+        self.model.run(None, {"input": self._vad_in[:1], "state": state, "sr": self._sr})
+
     def resample_audio(self, audio_data: np.ndarray, original_rate: int, target_rate: int) -> np.ndarray:
         """Resample audio data to target sample rate"""
         if original_rate == target_rate:
             return audio_data
         
-        # Calculate resampling ratio
-        ratio = target_rate / original_rate
-        new_length = int(len(audio_data) * ratio)
+        # Integer up/down factors for the polyphase filter, cached per rate pair
+        ratio = self._resample_ratios.get((original_rate, target_rate))
+        if ratio is None:
+            ratio = fractions.Fraction(target_rate, original_rate).limit_denominator(1000).as_integer_ratio()
+            self._resample_ratios[(original_rate, target_rate)] = ratio
+        up, down = ratio
         
-        # Use scipy's resample function
-        resampled = signal.resample(audio_data, new_length)
+        # Polyphase FIR resampling avoids the FFT-size cliff of signal.resample
+        resampled = signal.resample_poly(audio_data, up, down, window=('kaiser', 5.0))
         return resampled.astype(np.float32)
 
-    def is_speech(self, audio_data: bytes, sample_rate: int = 44100) -> bool:
-        """Detect if audio contains speech using Silero VAD model"""
+    def _next_row(self) -> np.ndarray:
+        """Batch input row the next queued frame (and its context) must be written into"""
+        return self._vad_in[len(self._pending)]
+
+    def _infer(self, stream: Tuple[np.ndarray, np.ndarray]) -> asyncio.Future:
+        """Queue the row written to _next_row() for the next batched forward pass"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((future, stream))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self):
+        """Run one batched forward pass over all queued frames and resolve their futures"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            # Each stream's (2, 1, 128) state becomes one column of the batched state
+            states = np.concatenate([state for _, (state, _) in batch], axis=1)
+            probs, new_states = self.model.run(
+                None, {"input": self._vad_in[:len(batch)], "state": states, "sr": self._sr}
+            )
+        except Exception as e:
+            for future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for i, (future, (state, context)) in enumerate(batch):
+            # Write the updated recurrent state and the frame's last samples back in place
+            # for the owning stream
+            state[:] = new_states[:, i:i + 1]
+            context[:] = self._vad_in[i, -VAD_CONTEXT_SAMPLES:]
+            # Skip callers that were cancelled (e.g. client disconnected) while queued
+            if not future.done():
+                future.set_result(float(probs[i, 0]))
+
+    def speech_probability(self, audio_float: np.ndarray,
+                           state: Tuple[np.ndarray, np.ndarray]) -> asyncio.Future:
+        """Queue one 16 kHz float32 frame of the stream `state` (from new_state()) for scoring
+
+        The middle 512 samples are scored, zero-padded at the tail when shorter. The returned
+        future resolves to the speech probability once the batch containing it has run.
+        """
+        row = self._next_row()
+        row[:VAD_CONTEXT_SAMPLES] = state[1]
+        frame = row[VAD_CONTEXT_SAMPLES:]
+        frame.fill(0)
+        n = min(len(audio_float), len(frame))
+        start_idx = (len(audio_float) - n) // 2
+        frame[:n] = audio_float[start_idx:start_idx + n]
+        return self._infer(state)
+
+    async def is_speech(self, audio_data: Union[bytes, np.ndarray], sample_rate: int = 44100, rms: float = None,
+                        state: Tuple[np.ndarray, np.ndarray] = None) -> bool:
+        """Detect if audio contains speech using Silero VAD model
+
+        `audio_data` is 16-bit PCM, either raw bytes or an int16 array the caller already holds.
+        `rms` is the packet's normalized RMS level when the caller has already computed it.
+        `state` is the stream's (recurrent state, context) from new_state(), updated in place;
+        without it the packet is scored from a fresh state.
+        """
         if not self.is_initialized or self.model is None:
             logger.warning("VAD not initialized, assuming speech")
             return True  # Assume speech if VAD is not available
             
         try:
-            # Convert raw bytes directly to numpy array of int16
-            audio_np = np.frombuffer(audio_data, dtype=np.int16)
+            # View raw bytes as int16 without copying; arrays from the caller are used as-is
+            if isinstance(audio_data, np.ndarray):
+                audio_np = audio_data
+            else:
+                audio_np = np.frombuffer(audio_data, dtype=np.int16)
             
             # Check if we have enough data
             if len(audio_np) == 0:
                 return False
             
             # Convert to float32 and normalize to [-1, 1] (VAD model expects float32)
-            audio_float = audio_np.astype(np.float32) / 32768.0
+            self._f32 = reserve_float32(self._f32, len(audio_np))
+            audio_float = pcm16_to_float32(audio_np, self._f32)
+            if rms is None:
+                rms = rms_level(audio_float)
             
             # Resample to target sample rate if needed
             if sample_rate != self.target_sample_rate:
                 audio_float = self.resample_audio(audio_float, sample_rate, self.target_sample_rate)
             
-            # VAD model requires exactly 512 samples for 16kHz
-            required_samples = 512
-            
-            if len(audio_float) < required_samples:
-                # Pad with zeros if too short
-                padded_audio = np.zeros(required_samples, dtype=np.float32)
-                padded_audio[:len(audio_float)] = audio_float
-                audio_float = padded_audio
-            elif len(audio_float) > required_samples:
-                # Take the middle portion if too long
-                start_idx = (len(audio_float) - required_samples) // 2
-                audio_float = audio_float[start_idx:start_idx + required_samples]
-            
-            # Convert to torch tensor with proper shape [1, samples] and float32 precision
-            audio_tensor = torch.from_numpy(audio_float).unsqueeze(0).float()
-            
-            # Get speech probability
-            with torch.no_grad():
-                speech_prob = self.model(audio_tensor, self.target_sample_rate).item()
+            # Get speech probability from the next batched forward pass. Nothing above yields to
+            # the event loop, so the shared scratch buffer and batch row are safe across connections
+            speech_prob = await self.speech_probability(
+                audio_float, state if state is not None else self.new_state()
+            )
             
             # Use adaptive threshold based on audio level - make it less aggressive
-            rms = np.sqrt(np.mean(audio_float ** 2))
             threshold = 0.2 if rms > 0.005 else 0.3  # Lower threshold for better speech detection
             
             is_speech_detected = speech_prob > threshold
             
             # Debug logging
             if is_speech_detected:
-                logger.debug(f"VAD: Speech detected (prob: {speech_prob:.3f}, rms: {rms:.4f})")
+                logger.debug("VAD: Speech detected (prob: %.3f, rms: %.4f)", speech_prob, rms)
             
             return is_speech_detected
             
@@ -120,6 +370,17 @@ class VoiceActivityDetector:
             # Return True (assume speech) if VAD fails to avoid losing audio
             return True
 
+# One detector shared by every connection: a single copy of the model weights, and
+# frames from concurrent clients can share a batched forward pass
+VAD_INSTANCE: Optional[VoiceActivityDetector] = None
+
+def get_vad() -> VoiceActivityDetector:
+    """The shared detector, built on first use (normally by the app's startup)"""
+    global VAD_INSTANCE
+    if VAD_INSTANCE is None:
+        VAD_INSTANCE = VoiceActivityDetector()
+    return VAD_INSTANCE
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -149,10 +410,16 @@ class AwaazConnection:
         )
         self.ws = None
         self.config = None
+        self._setup_message = None  # JSON text of the setup message, built by set_config
         self.running = True
-        self.vad = VoiceActivityDetector()
+        self.vad = get_vad()
+        self.vad_state = self.vad.new_state()  # Silero recurrent state and context for this client's stream
         self.is_playing = False
+        self.output_mime_type = None  # Format of the current turn's audio, announced to the browser once
         self.vad_enabled = True  # Flag to enable/disable VAD
+        self.input_sample_rate = 16000  # Sample rate of binary PCM frames from the client
+        self._f32 = np.empty(4096, dtype=np.float32)  # Scratch buffer for RMS
+        self._silence_cache: Dict[int, str] = {}  # Base64 silence payloads keyed by byte length
 
     async def connect(self):
         """Initialize connection to Awaaz"""
@@ -164,43 +431,13 @@ class AwaazConnection:
             if not self.config:
                 raise ValueError("Configuration must be set before connecting")
 
-            # Configure generation settings - don't use tools if google search is disabled
-            generation_config = {
-                "response_modalities": ["AUDIO"],
-                "speech_config": {
-                    "voice_config": {
-                        "prebuilt_voice_config": {
-                            "voice_name": self.config.get("voice", "Puck")
-                        }
-                    }
-                }
-            }
-            
-            # Add tools if google search is enabled
-            if self.config.get("google_search", False):
-                generation_config["tools"] = [google_search_tool]
-            
-            setup_message = {
-                "setup": {
-                    "model": f"models/{self.model}",
-                    "generation_config": generation_config,
-                    "system_instruction": {
-                        "parts": [
-                            {
-                                "text": self.config.get("systemPrompt", "You are a helpful assistant.")
-                            }
-                        ]
-                    }
-                }
-            }
-
             logger.info(f"Sending setup message with voice: {self.config.get('voice', 'Puck')}")
             logger.info(f"System prompt: {self.config.get('systemPrompt', 'You are a helpful assistant.')[:100]}...")
 
             # Google Search removed - not needed for wellness/study voice agent
             # Focus on conversational AI without external search distractions
 
-            await self.ws.send(json.dumps(setup_message))
+            await self.ws.send(self._setup_message)
             logger.info("Setup message sent, waiting for response...")
             
             # Wait for setup completion with timeout
@@ -223,41 +460,96 @@ class AwaazConnection:
         self.config = config
         # Check if VAD should be disabled
         self.vad_enabled = config.get("vad_enabled", True)
+        # Sample rate of binary PCM frames, which carry no per-message metadata
+        self.input_sample_rate = config.get("sampleRate", 16000)
         logger.info(f"VAD enabled: {self.vad_enabled}")
 
+        # Configure generation settings - don't use tools if google search is disabled
+        generation_config = {
+            "response_modalities": ["AUDIO"],
+            "speech_config": {
+                "voice_config": {
+                    "prebuilt_voice_config": {
+                        "voice_name": self.config.get("voice", "Puck")
+                    }
+                }
+            }
+        }
+        
+        # Add tools if google search is enabled
+        if self.config.get("google_search", False):
+            generation_config["tools"] = [google_search_tool]
+        
+        setup_message = {
+            "setup": {
+                "model": f"models/{self.model}",
+                "generation_config": generation_config,
+                "system_instruction": {
+                    "parts": [
+                        {
+                            "text": self.config.get("systemPrompt", "You are a helpful assistant.")
+                        }
+                    ]
+                }
+            }
+        }
+        # Serialized once per config so (re)connecting only sends the cached text frame
+        self._setup_message = orjson.dumps(setup_message).decode()
+
+    def _encoded_silence(self, num_bytes: int) -> str:
+        """Base64-encoded silence of the given byte length, cached since packet sizes repeat"""
+        audio_data = self._silence_cache.get(num_bytes)
+        if audio_data is None:
+            audio_data = base64.b64encode(bytes(num_bytes)).decode("utf-8")
+            self._silence_cache[num_bytes] = audio_data
+        return audio_data
+
     async def send_audio(self, audio_data: str, sample_rate: int = 16000):
-        """Send audio data to Awaaz with voice activity detection"""
+        """Send base64-encoded audio (JSON text frames) to Awaaz"""
+        logger.debug("Sending audio to Gemini - Input: %d chars, sample_rate: %s", len(audio_data), sample_rate)
         try:
-            logger.debug(f"Sending audio to Gemini - Input: {len(audio_data)} chars, sample_rate: {sample_rate}")
-            
-            # Decode base64 audio data
             audio_bytes = base64.b64decode(audio_data)
-            logger.debug(f"Decoded audio bytes: {len(audio_bytes)} bytes")
+        except Exception as e:
+            logger.error("Error decoding audio: %s", e)
+            return
+        await self.send_audio_bytes(audio_bytes, sample_rate)
+
+    async def send_audio_bytes(self, audio_bytes: bytes, sample_rate: int = 16000):
+        """Send raw 16-bit PCM audio to Awaaz with voice activity detection"""
+        try:
+            logger.debug("Audio bytes: %d bytes", len(audio_bytes))
             
             # Only process if we have valid audio data
             if len(audio_bytes) == 0:
                 logger.warning("Empty audio data, skipping")
                 return
             
+            # PCM payload forwarded to Gemini (None when no speech is detected and silence is sent)
+            pcm = audio_bytes
+            
             # Calculate audio level for debugging
             audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-            rms = np.sqrt(np.mean(audio_np.astype(np.float32) ** 2))
-            logger.debug(f"Audio RMS level: {rms:.6f}, samples: {len(audio_np)}, sample_rate: {sample_rate}")
+            self._f32 = reserve_float32(self._f32, len(audio_np))
+            rms = rms_level(pcm16_to_float32(audio_np, self._f32))
+            logger.debug("Audio RMS level: %.6f, samples: %d, sample_rate: %s", rms, len(audio_np), sample_rate)
             
             # Apply Voice Activity Detection (if enabled)
             if self.vad_enabled:
                 try:
-                    is_speech = self.vad.is_speech(audio_bytes, sample_rate)
-                    logger.debug(f"VAD result: is_speech={is_speech}")
+                    if rms < NOISE_FLOOR_RMS:
+                        # Obvious silence - skip the model forward pass entirely
+                        is_speech = False
+                    else:
+                        is_speech = await self.vad.is_speech(audio_np, sample_rate, rms=rms, state=self.vad_state)
+                    logger.debug("VAD result: is_speech=%s", is_speech)
                     if not is_speech:
                         # Send silence instead of actual audio when no speech is detected
-                        silence_data = b'\x00' * len(audio_bytes)
-                        audio_data = base64.b64encode(silence_data).decode("utf-8")
+                        pcm = None
                         logger.debug("VAD: No speech detected, sending silence")
                     else:
                         logger.debug("VAD: Speech detected, sending audio")
                 except Exception as vad_error:
-                    logger.error(f"VAD error: {vad_error}")
+                    logger.error("VAD error: %s", vad_error)
                     # If VAD fails, assume it's speech to avoid losing audio
                     logger.warning("VAD failed, assuming speech")
             else:
@@ -266,26 +558,16 @@ class AwaazConnection:
             # Only send audio if not currently playing (unless interruptions are allowed)
             allow_interruptions = self.config.get("allow_interruptions", False)
             should_process = (not self.is_playing) or (self.is_playing and allow_interruptions)
-            logger.debug(f"Should process audio: {should_process} (is_playing: {self.is_playing}, allow_interruptions: {allow_interruptions})")
+            logger.debug("Should process audio: %s (is_playing: %s, allow_interruptions: %s)", should_process, self.is_playing, allow_interruptions)
             
             if should_process:
-                # Convert 16kHz input to 24kHz for Gemini Live API
-                if sample_rate == 16000:
-                    # Resample audio from 16kHz to 24kHz
-                    audio_np = np.frombuffer(audio_bytes, dtype=np.int16)
-                    audio_float = audio_np.astype(np.float32) / 32768.0
-                    
-                    logger.debug(f"Resampling from 16kHz to 24kHz: {len(audio_float)} -> {int(len(audio_float) * 1.5)} samples")
-                    
-                    # Resample to 24kHz
-                    resampled_audio = self.vad.resample_audio(audio_float, 16000, 24000)
-                    
-                    # Convert back to 16-bit PCM
-                    resampled_int16 = (resampled_audio * 32768).astype(np.int16)
-                    audio_data = base64.b64encode(resampled_int16.tobytes()).decode("utf-8")
-                    sample_rate = 24000
-                    
-                    logger.debug(f"Resampled audio: {len(resampled_int16)} samples at {sample_rate}Hz")
+                # Gemini Live accepts 16kHz PCM directly, so audio goes out at its native rate
+                if pcm is None:
+                    # Reuse the cached base64 silence payload for this packet length
+                    audio_data = self._encoded_silence(len(audio_bytes))
+                else:
+                    # Base64-encode exactly once, where the Gemini JSON payload is built
+                    audio_data = base64.b64encode(pcm).decode("utf-8")
                 
                 realtime_input_msg = {
                     "realtimeInput": {
@@ -297,10 +579,10 @@ class AwaazConnection:
                         ]
                     }
                 }
-                logger.debug(f"Sending to Gemini API: {len(audio_data)} chars")
-                logger.debug(f"Message structure: {json.dumps(realtime_input_msg, indent=2)}")
+                logger.debug("Sending to Gemini API: %d chars", len(audio_data))
+                logger.debug("Message structure: %s", realtime_input_msg)
                 
-                await self.ws.send(json.dumps(realtime_input_msg))
+                await self.ws.send(orjson.dumps(realtime_input_msg).decode())
                 logger.info("Audio sent successfully to Gemini API")
                 
                 # Don't try to get immediate response here - let the receive loop handle it
@@ -308,9 +590,7 @@ class AwaazConnection:
             else:
                 logger.debug("Skipping audio - currently playing and interruptions not allowed")
         except Exception as e:
-            logger.error(f"Error processing audio: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Error processing audio: %s", e)
 
 
     async def close(self):
@@ -382,29 +662,8 @@ async def get_agent_modes():
         }
     }
 
-@app.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    logger.info(f"WebSocket connection attempt from client: {client_id}")
-    await websocket.accept()
-    logger.info(f"WebSocket connection accepted for client: {client_id}")
-    
-    try:
-        # Create new Awaaz connection for this client
-        awaaz = AwaazConnection()
-        connections[client_id] = awaaz
-        
-        # Wait for initial configuration
-        config_data = await websocket.receive_json()
-        if config_data.get("type") != "config":
-            raise ValueError("First message must be configuration")
-        
-        # Get the configuration and apply mode-specific system prompt
-        config = config_data.get("config", {})
-        mode = config.get("mode", "wellness")
-        
-        # Apply mode-specific system prompt
-        if mode == "study":
-            config["systemPrompt"] = """You are Awaaz, a compassionate AI study companion specializing in voice journalling for academic wellbeing. Your primary role is to listen actively and help students process their academic experiences through guided reflection.
+# Mode-specific system prompts, built once at import rather than per connection
+STUDY_SYSTEM_PROMPT = """You are Awaaz, a compassionate AI study companion specializing in voice journalling for academic wellbeing. Your primary role is to listen actively and help students process their academic experiences through guided reflection.
 
 CORE OBJECTIVES:
 - Create a safe, non-judgmental space for students to voice their academic concerns, challenges, and experiences
@@ -428,8 +687,8 @@ CONVERSATION STYLE:
 - Be multilingual (English/Hindi) and culturally sensitive to Indian academic contexts
 
 Remember: You're a listening companion, not a study coach. Your job is to help them process and understand their academic experience through thoughtful conversation."""
-        else:  # wellness mode
-            config["systemPrompt"] = """You are Awaaz, a compassionate AI wellness companion specializing in voice journalling for mental wellbeing. Your primary role is to listen actively and help users process their daily experiences through guided reflection.
+
+WELLNESS_SYSTEM_PROMPT = """You are Awaaz, a compassionate AI wellness companion specializing in voice journalling for mental wellbeing. Your primary role is to listen actively and help users process their daily experiences through guided reflection.
 
 CORE OBJECTIVES:
 - Create a safe, non-judgmental space for users to voice their thoughts, feelings, and daily experiences
@@ -453,6 +712,29 @@ CONVERSATION STYLE:
 - Be multilingual (English/Hindi) and culturally sensitive to Indian contexts
 
 Remember: You're a listening companion, not a therapist. Your job is to help them process and understand their experiences through thoughtful conversation."""
+
+@app.websocket("/ws/{client_id}")
+async def websocket_endpoint(websocket: WebSocket, client_id: str):
+    logger.info(f"WebSocket connection attempt from client: {client_id}")
+    await websocket.accept()
+    logger.info(f"WebSocket connection accepted for client: {client_id}")
+    
+    try:
+        # Create new Awaaz connection for this client
+        awaaz = AwaazConnection()
+        connections[client_id] = awaaz
+        
+        # Wait for initial configuration
+        config_data = orjson.loads(await websocket.receive_text())
+        if config_data.get("type") != "config":
+            raise ValueError("First message must be configuration")
+        
+        # Get the configuration and apply mode-specific system prompt
+        config = config_data.get("config", {})
+        mode = config.get("mode", "wellness")
+        
+        # Apply mode-specific system prompt
+        config["systemPrompt"] = STUDY_SYSTEM_PROMPT if mode == "study" else WELLNESS_SYSTEM_PROMPT
         
         # Set the configuration
         awaaz.set_config(config)
@@ -464,11 +746,7 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
         logger.info(f"   - Mode: {mode}")
         
         # Send configuration confirmation
-        await websocket.send_json({
-            "type": "status",
-            "status": "config_received",
-            "text": f"Configuration received for {mode} mode"
-        })
+        await send_frame(websocket, StatusFrame(status="config_received", text=f"Configuration received for {mode} mode"))
         
         # Initialize Awaaz connection
         logger.info(f"Attempting to connect to Awaaz for client: {client_id}")
@@ -477,17 +755,10 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
             logger.info(f"Awaaz connection established for client: {client_id}")
             
             # Send connection success message
-            await websocket.send_json({
-                "type": "status", 
-                "status": "connected",
-                "text": "Connected to AI service successfully"
-            })
+            await send_frame(websocket, StatusFrame(status="connected", text="Connected to AI service successfully"))
         except Exception as e:
             logger.error(f"Failed to connect to Awaaz: {e}")
-            await websocket.send_json({
-                "type": "error",
-                "text": f"Failed to connect to AI service: {str(e)}"
-            })
+            await send_frame(websocket, ErrorFrame(text=f"Failed to connect to AI service: {str(e)}"))
             return
         
         # Handle bidirectional communication
@@ -497,47 +768,52 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                 while True:
                     try:
                         message = await websocket.receive()
-                        logger.debug(f"Received message from client: {message['type']}")
+                        logger.debug("Received message from client: %s", message['type'])
                         
                         # Check for close message
                         if message["type"] == "websocket.disconnect":
                             logger.info("Received disconnect message")
                             return
+                        
+                        # Binary frames carry raw 16-bit PCM - no base64/JSON decoding needed
+                        if message.get("bytes") is not None:
+                            await awaaz.send_audio_bytes(message["bytes"], awaaz.input_sample_rate)
+                            continue
                             
-                        message_content = json.loads(message["text"])
+                        message_content = orjson.loads(message["text"])
                         msg_type = message_content["type"]
-                        logger.debug(f"Message type: {msg_type}")
+                        logger.debug("Message type: %s", msg_type)
                         
                         if msg_type == "audio":
                             sample_rate = message_content.get("sampleRate", 44100)
                             data_length = len(message_content.get("data", ""))
-                            logger.debug(f"Audio message: {data_length} chars, sample_rate: {sample_rate}")
+                            logger.debug("Audio message: %s chars, sample_rate: %s", data_length, sample_rate)
                             await awaaz.send_audio(message_content["data"], sample_rate)    
                         else:
-                            logger.warning(f"Unknown message type: {msg_type}")
-                    except json.JSONDecodeError as e:
-                        logger.error(f"JSON decode error: {e}")
+                            logger.warning("Unknown message type: %s", msg_type)
+                    except orjson.JSONDecodeError as e:
+                        logger.error("JSON decode error: %s", e)
                         continue
                     except KeyError as e:
-                        logger.error(f"Key error in message: {e}")
+                        logger.error("Key error in message: %s", e)
                         continue
                     except Exception as e:
-                        logger.error(f"Error processing client message: {str(e)}")
+                        logger.error("Error processing client message: %s", e)
                         if "disconnect" in str(e).lower() or "closed" in str(e).lower():
                             return
                         continue
                             
             except Exception as e:
-                logger.error(f"Fatal error in receive_from_client: {str(e)}")
+                logger.error("Fatal error in receive_from_client: %s", e)
                 return
 
         async def receive_from_awaaz():
             try:
                 logger.info("Starting to receive from Gemini API...")
-                logger.debug(f"Awaaz running status: {awaaz.running}")
-                logger.debug(f"Awaaz WebSocket status: {awaaz.ws is not None}")
+                logger.debug("Awaaz running status: %s", awaaz.running)
+                logger.debug("Awaaz WebSocket status: %s", awaaz.ws is not None)
                 if awaaz.ws:
-                    logger.debug(f"WebSocket state: {awaaz.ws.state}")
+                    logger.debug("WebSocket state: %s", awaaz.ws.state)
                 message_count = 0
                 
                 # Use async for loop like in standalone implementation
@@ -552,155 +828,161 @@ Remember: You're a listening companion, not a therapist. Your job is to help the
                             break
                             
                         try:
-                        message_count += 1
-                        logger.debug(f"Raw message from Gemini: {len(msg)} chars")
-                        logger.debug(f"Message preview: {msg[:500]}...")
+                            message_count += 1
+                            logger.debug("Raw message from Gemini: %d chars", len(msg))
+                            logger.debug("Message preview: %.500s...", msg)
                         
-                        response = json.loads(msg)
-                        logger.info(f"Parsed response keys: {list(response.keys())}")
-                        logger.info(f"Full response structure: {json.dumps(response, indent=2)}")
+                            # Fast path: forward audio-only frames without parsing the base64 payload into a dict
+                            audio_frame = match_audio_frame(msg)
+                            if audio_frame is not None:
+                                mime_type, audio_data_b64 = audio_frame
+                                awaaz.is_playing = True
+                                logger.debug("Audio data: %d chars with MIME type: %s", len(audio_data_b64), mime_type)
+                                try:
+                                    await forward_audio(websocket, awaaz, audio_data_b64, mime_type)
+                                except Exception as send_error:
+                                    logger.error("Error sending audio to frontend: %s", send_error)
+                                    return
+                                continue
+                        
+                            response = orjson.loads(msg)
+                            logger.info("Parsed response keys: %s", list(response.keys()))
+                            logger.debug("Full response structure: %s", response)
                         
-                        # Process Gemini 2.0 WebSocket response format
-                        if "serverContent" in response:
-                            server_content = response["serverContent"]
-                            logger.debug(f"Server content keys: {list(server_content.keys())}")
+                            # Process Gemini 2.0 WebSocket response format
+                            # One .get per key: each lookup is done once and reused below
+                            server_content = response.get("serverContent")
+                            if server_content is not None:
+                                logger.debug("Server content keys: %s", server_content.keys())
                             
-                            if "modelTurn" in server_content:
-                                model_turn = server_content["modelTurn"]
-                                logger.debug(f"Model turn keys: {list(model_turn.keys())}")
+                                model_turn = server_content.get("modelTurn")
+                                if model_turn is not None:
+                                    logger.debug("Model turn keys: %s", model_turn.keys())
                                 
-                                if "parts" in model_turn:
-                                    parts = model_turn["parts"]
-                                    logger.info(f"Model turn parts: {len(parts)} parts received")
+                                    parts = model_turn.get("parts")
+                                    if parts is not None:
+                                        logger.info("Model turn parts: %d parts received", len(parts))
                                     
-                                    for i, part in enumerate(parts):
-                                        logger.debug(f"Part {i} keys: {list(part.keys())}")
+                                        for i, part in enumerate(parts):
+                                            logger.debug("Part %s keys: %s", i, part.keys())
                                         
-                                        if "inlineData" in part:
-                                            # This indicates audio data
-                                            logger.info("Audio data found in response!")
-                                            awaaz.is_playing = True
+                                            inline_data = part.get("inlineData")
+                                            text_content = part.get("text") if inline_data is None else None
+                                            if inline_data is not None:
+                                                # This indicates audio data
+                                                logger.info("Audio data found in response!")
+                                                awaaz.is_playing = True
                                             
-                                            # Extract both the audio data and its MIME type
-                                            inline_data = part["inlineData"]
-                                            audio_data_b64 = inline_data["data"]
-                                            mime_type = inline_data.get("mimeType", "audio/opus")  # Default to Opus for Gemini Live API
+                                                # Extract both the audio data and its MIME type
+                                                audio_data_b64 = inline_data["data"]
+                                                mime_type = inline_data.get("mimeType", "audio/opus")  # Default to Opus for Gemini Live API
                                             
-                                            logger.info(f"Audio data: {len(audio_data_b64)} chars with MIME type: {mime_type}")
+                                                logger.info("Audio data: %d chars with MIME type: %s", len(audio_data_b64), mime_type)
                                             
-                                            try:
-                                                # Send both data and mimeType to the frontend
-                                                await websocket.send_json({
-                                                    "type": "audio",
-                                                    "data": audio_data_b64,
-                                                    "mimeType": mime_type
-                                                })
-                                                logger.info("Audio data sent to frontend successfully")
-                                            except Exception as send_error:
-                                                logger.error(f"Error sending audio to frontend: {send_error}")
-                                                return
+                                                try:
+                                                    # Send the PCM (and its format, once per turn) to the frontend
+                                                    await forward_audio(websocket, awaaz, audio_data_b64, mime_type)
+                                                    logger.info("Audio data sent to frontend successfully")
+                                                except Exception as send_error:
+                                                    logger.error("Error sending audio to frontend: %s", send_error)
+                                                    return
                                                 
-                                        elif "text" in part:
-                                            # If the model also responds with text, forward it
-                                            text_content = part["text"]
-                                            logger.info(f"Text response: {text_content}")
-                                            try:
-                                                await websocket.send_json({
-                                                    "type": "text",
-                                                    "text": text_content
-                                                })
-                                                logger.info("Text response sent to frontend")
-                                            except Exception as send_error:
-                                                logger.error(f"Error sending text to frontend: {send_error}")
-                                                return
-                                        else:
-                                            logger.warning(f"Unknown part type: {part}")
+                                            elif text_content is not None:
+                                                # If the model also responds with text, forward it
+                                                logger.info("Text response: %s", text_content)
+                                                try:
+                                                    await send_frame(websocket, TextFrame(text=text_content))
+                                                    logger.info("Text response sent to frontend")
+                                                except Exception as send_error:
+                                                    logger.error("Error sending text to frontend: %s", send_error)
+                                                    return
+                                            else:
+                                                logger.warning("Unknown part type: %s", part)
+                                    else:
+                                        logger.warning("No parts in modelTurn")
                                 else:
-                                    logger.warning("No parts in modelTurn")
-                            else:
-                                logger.warning("No modelTurn in serverContent")
+                                    logger.warning("No modelTurn in serverContent")
                             
-                            # Check if the model ended its turn
-                            if server_content.get("turnComplete"):
-                                awaaz.is_playing = False
-                                logger.info("Turn completed by Gemini")
-                                try:
-                                    await websocket.send_json({
-                                        "type": "status",
-                                        "status": "listening"
-                                    })
-                                    logger.info("Listening status sent to frontend")
-                                except Exception as send_error:
-                                    logger.error(f"Error sending status: {send_error}")
-                                    return
+                                # Check if the model ended its turn
+                                if server_content.get("turnComplete"):
+                                    awaaz.is_playing = False
+                                    awaaz.output_mime_type = None
+                                    logger.info("Turn completed by Gemini")
+                                    try:
+                                        await send_frame(websocket, StatusFrame(status="listening"))
+                                        logger.info("Listening status sent to frontend")
+                                    except Exception as send_error:
+                                        logger.error("Error sending status: %s", send_error)
+                                        return
+                                else:
+                                    logger.debug("Turn not complete yet")
                             else:
-                                logger.debug("Turn not complete yet")
-                        else:
-                            logger.warning(f"Unexpected response format: {response}")
-                            # Check if this is a different type of response
-                            if "turnComplete" in response:
-                                logger.info("Turn completed (direct)")
-                                awaaz.is_playing = False
-                            elif "error" in response:
-                                logger.error(f"Error in response: {response['error']}")
-                            elif "candidates" in response:
-                                # Handle different response format
-                                logger.info("Found candidates in response")
-                                candidates = response.get("candidates", [])
-                                for candidate in candidates:
-                                    if "content" in candidate:
-                                        content = candidate["content"]
-                                        if "parts" in content:
-                                            parts = content["parts"]
-                                            for part in parts:
-                                                if "inlineData" in part:
-                                                    logger.info("Audio data found in candidates!")
-                                                    awaaz.is_playing = True
+                                logger.warning("Unexpected response format: %s", response)
+                                # Check if this is a different type of response
+                                if "turnComplete" in response:
+                                    logger.info("Turn completed (direct)")
+                                    awaaz.is_playing = False
+                                    awaaz.output_mime_type = None
+                                elif "error" in response:
+                                    logger.error("Error in response: %s", response['error'])
+                                elif "candidates" in response:
+                                    # Handle different response format
+                                    logger.info("Found candidates in response")
+                                    candidates = response.get("candidates", [])
+                                    for candidate in candidates:
+                                        content = candidate.get("content")
+                                        if content is not None:
+                                            parts = content.get("parts")
+                                            if parts is not None:
+                                                for part in parts:
+                                                    inline_data = part.get("inlineData")
+                                                    if inline_data is not None:
+                                                        logger.info("Audio data found in candidates!")
+                                                        awaaz.is_playing = True
                                                     
-                                                    # Extract both the audio data and its MIME type
-                                                    inline_data = part["inlineData"]
-                                                    audio_data_b64 = inline_data["data"]
-                                                    mime_type = inline_data.get("mimeType", "audio/opus")  # Default to Opus for Gemini Live API
+                                                        # Extract both the audio data and its MIME type
+                                                        audio_data_b64 = inline_data["data"]
+                                                        mime_type = inline_data.get("mimeType", "audio/opus")  # Default to Opus for Gemini Live API
                                                     
-                                                    try:
-                                                        await websocket.send_json({
-                                                            "type": "audio",
-                                                            "data": audio_data_b64,
-                                                            "mimeType": mime_type
-                                                        })
-                                                        logger.info("Audio data sent to frontend from candidates")
-                                                    except Exception as send_error:
-                                                        logger.error(f"Error sending audio from candidates: {send_error}")
-                            else:
-                                logger.debug(f"Full response: {json.dumps(response, indent=2)}")
+                                                        try:
+                                                            await forward_audio(websocket, awaaz, audio_data_b64, mime_type)
+                                                            logger.info("Audio data sent to frontend from candidates")
+                                                        except Exception as send_error:
+                                                            logger.error("Error sending audio from candidates: %s", send_error)
+                                else:
+                                    logger.debug("Full response: %s", response)
                             
-                    except Exception as receive_error:
-                        logger.error(f"Error processing Gemini response: {receive_error}")
-                        import traceback
-                        traceback.print_exc()
-                        # Continue processing other messages
-                        continue
+                        except Exception as receive_error:
+                            logger.exception("Error processing Gemini response: %s", receive_error)
+                            # Continue processing other messages
+                            continue
+                except ConnectionClosed as closed:
+                    logger.warning("Gemini connection closed: %s", closed)
                             
             except Exception as e:
-                logger.error(f"Fatal error in receive_from_awaaz: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Fatal error in receive_from_awaaz: %s", e)
                 return
             finally:
                 logger.info("Receive from Awaaz loop ended")
 
         # Run both receiving tasks concurrently
         logger.info("Starting concurrent tasks: receive_from_client and receive_from_awaaz")
+        tasks = [
+            asyncio.create_task(receive_from_client()),
+            asyncio.create_task(receive_from_awaaz()),
+        ]
         try:
-            await asyncio.gather(
-                receive_from_client(),
-                receive_from_awaaz(),
-                return_exceptions=True
-            )
-        except Exception as gather_error:
-            logger.error(f"Error in asyncio.gather: {gather_error}")
-            import traceback
-            traceback.print_exc()
+            # Whichever side finishes first (client gone, Gemini closed) ends the session
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    logger.error("Receive task failed: %s", task.exception())
+        except Exception as wait_error:
+            logger.exception("Error in receive tasks: %s", wait_error)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
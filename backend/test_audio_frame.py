@@ -0,0 +1,65 @@
+"""
+Unit tests for match_audio_frame, the fast path that lets audio-only Gemini frames skip JSON parsing
+Run from backend/: python -m pytest test_audio_frame.py
+"""
+
+import orjson
+import pytest
+
+from main import base64, match_audio_frame
+
+MIME_TYPE = "audio/pcm;rate=24000"
+PCM = bytes(range(256)) * 4
+PCM_B64 = base64.b64encode(PCM).decode()
+
+def audio_frame(**server_content) -> dict:
+    frame = {"serverContent": {"modelTurn": {"parts": [{"inlineData": {"mimeType": MIME_TYPE, "data": PCM_B64}}]}}}
+    frame["serverContent"].update(server_content)
+    return frame
+
+def encodings(frame: dict):
+    """The frame as Gemini may send it: compact or spaced, as a text or a binary message"""
+    compact = orjson.dumps(frame).decode()
+    spaced = orjson.dumps(frame, option=orjson.OPT_INDENT_2).decode()
+    return [compact, compact.encode(), spaced, spaced.encode()]
+
+@pytest.mark.parametrize("msg", encodings(audio_frame()))
+def test_audio_frame_matches(msg):
+    result = match_audio_frame(msg)
+    assert result is not None
+    mime_type, data = result
+    assert mime_type == MIME_TYPE
+    if isinstance(msg, bytes):
+        # Binary frames yield a zero-copy view that still decodes to the original PCM
+        assert isinstance(data, memoryview)
+    else:
+        assert data == PCM_B64
+    assert base64.b64decode(data) == PCM
+
+@pytest.mark.parametrize("msg", encodings(
+    {"serverContent": {"modelTurn": {"parts": [{"inlineData": {"data": PCM_B64, "mimeType": MIME_TYPE}}]}}}
+))
+def test_data_before_mime_type_falls_through(msg):
+    assert match_audio_frame(msg) is None
+
+@pytest.mark.parametrize("msg", encodings(audio_frame(turnComplete=True)))
+def test_extra_keys_fall_through(msg):
+    assert match_audio_frame(msg) is None
+
+@pytest.mark.parametrize("msg", encodings(
+    {"serverContent": {"modelTurn": {"parts": [{"text": "Hello there"}]}}}
+))
+def test_text_part_falls_through(msg):
+    assert match_audio_frame(msg) is None
+
+@pytest.mark.parametrize("msg", encodings(audio_frame()))
+def test_truncated_payload_falls_through(msg):
+    quote = b'"' if isinstance(msg, bytes) else '"'
+    data_start = msg.index(PCM_B64[:16].encode() if isinstance(msg, bytes) else PCM_B64[:16])
+    # Cut inside the base64 payload, before its closing quote
+    assert match_audio_frame(msg[:data_start + 100]) is None
+    # Cut right after the closing quote, before the closing braces
+    assert match_audio_frame(msg[:msg.index(quote, data_start) + 1]) is None
+
+def test_other_message_types_fall_through():
+    assert match_audio_frame(bytearray(orjson.dumps(audio_frame()))) is None
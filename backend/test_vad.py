@@ -0,0 +1,61 @@
+"""
+Regression test: the batched ONNX VAD must score audio like the reference TorchScript Silero model
+Run from backend/: python -m pytest test_vad.py (needs requirements-dev.txt)
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+silero_vad = pytest.importorskip("silero_vad")
+
+from main import VAD_FRAME_SAMPLES, VoiceActivityDetector
+
+SAMPLE_RATE = 16000
+
+def voiced_clip(seconds: float = 3.0, f0: float = 140.0, seed: int = 0) -> np.ndarray:
+    """Fixed vowel-like clip: formant-weighted harmonics of a gliding pitch, syllable-rate envelope"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = f0 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    clip = np.zeros_like(t)
+    for k in range(1, 30):
+        weight = sum(np.exp(-((k * pitch - formant) / width) ** 2)
+                     for formant, width in ((700, 130), (1220, 170), (2600, 250)))
+        clip += weight * np.sin(k * phase) / np.sqrt(k)
+    clip *= 0.5 * (1 - np.cos(2 * np.pi * 4 * t))
+    clip = 0.3 * clip / np.abs(clip).max()
+    clip += np.random.default_rng(seed).normal(0, 1e-3, len(clip))
+    return clip.astype(np.float32)
+
+def frames(clip: np.ndarray):
+    return [clip[i:i + VAD_FRAME_SAMPLES] for i in range(0, len(clip) - VAD_FRAME_SAMPLES + 1, VAD_FRAME_SAMPLES)]
+
+def torchscript_probs(model, clip: np.ndarray) -> np.ndarray:
+    model.reset_states()
+    return np.array([model(torch.from_numpy(frame), SAMPLE_RATE).item() for frame in frames(clip)])
+
+async def onnx_probs(detector: VoiceActivityDetector, clips):
+    """Score several streams frame by frame; each step's frames share one batched forward pass"""
+    states = [detector.new_state() for _ in clips]
+    steps = zip(*(frames(clip) for clip in clips))
+    return np.array([
+        await asyncio.gather(*(detector.speech_probability(frame, state) for frame, state in zip(step, states)))
+        for step in steps
+    ]).T
+
+def test_onnx_matches_torchscript():
+    detector = VoiceActivityDetector()
+    assert detector.is_initialized
+    model = silero_vad.load_silero_vad()
+
+    clips = [voiced_clip(), voiced_clip(f0=210.0, seed=1)[::-1].copy()]
+    onnx = asyncio.run(onnx_probs(detector, clips))
+
+    for clip, probs in zip(clips, onnx):
+        reference = torchscript_probs(model, clip)
+        # The clip must actually exercise the model, not just agree on silence
+        assert reference.max() > 0.2
+        np.testing.assert_allclose(probs, reference, atol=1e-4)
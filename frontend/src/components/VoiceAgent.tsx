@@ -56,12 +56,12 @@ export const VoiceAgent = () => {
     switch (message.type) {
       case 'audio':
         logger.info('Audio message received', { 
-          dataLength: message.data?.length, 
+          byteLength: message.audio?.byteLength, 
           mimeType: message.mimeType 
         }, 'VoiceAgent');
-        if (message.data && audioServiceRef.current) {
+        if (message.audio && audioServiceRef.current) {
           logger.debug('Attempting to play audio', { mimeType: message.mimeType }, 'VoiceAgent');
-          audioServiceRef.current.playAudio(message.data, message.mimeType || 'audio/pcm;rate=24000').catch(error => {
+          audioServiceRef.current.playAudio(message.audio, message.mimeType || 'audio/pcm;rate=24000').catch(error => {
             logger.error('Error playing audio', { error }, 'VoiceAgent');
           });
         } else {
@@ -116,7 +116,7 @@ export const VoiceAgent = () => {
       audioServiceRef.current = new AudioService({
         onAudioData: (audioData, sampleRate) => {
           logger.debug('Audio callback received', { 
-            dataLength: audioData.length, 
+            byteLength: audioData.byteLength, 
             sampleRate, 
             muted: isMuted 
           }, 'VoiceAgent');
@@ -126,8 +126,8 @@ export const VoiceAgent = () => {
             lastAudioTime: new Date()
           }));
           if (voiceServiceRef.current && !isMuted) {
-            // Send audio at 16kHz (will be converted to 24kHz in backend)
-            voiceServiceRef.current.sendAudio(audioData, sampleRate);
+            // Send audio at 16kHz (forwarded to Gemini as-is, as audio/pcm;rate=16000)
+            voiceServiceRef.current.sendAudio(audioData);
           } else {
             logger.debug("Not sending audio - service not ready or muted", {}, 'VoiceAgent');
           }
@@ -153,7 +153,8 @@ export const VoiceAgent = () => {
         voice: "Puck",
         allowInterruptions: true,
         mode: mode,
-        vad_enabled: true
+        vad_enabled: true,
+        sampleRate: 16000
       };
 
       await voiceServiceRef.current.connect(config);
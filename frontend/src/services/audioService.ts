@@ -6,7 +6,7 @@
 import { logger } from './loggingService';
 
 export interface AudioServiceCallbacks {
-  onAudioData: (audioData: string, sampleRate: number) => void;
+  onAudioData: (audioData: ArrayBuffer, sampleRate: number) => void;
   onError: (error: string) => void;
   onVADStatus?: (isSpeech: boolean, confidence: number) => void;
 }
@@ -279,12 +279,9 @@ export class AudioService {
         pcmData[j] = Math.max(-32768, Math.min(32767, chunk[j] * 32768));
       }
       
-      // Convert to base64
-      const base64Data = this.arrayBufferToBase64(pcmData.buffer);
-      
-      // Send each chunk immediately (like standalone) with 16kHz input rate
-      logger.debug(`Sending audio chunk: ${base64Data.length} chars, sample rate: ${this.TARGET_SAMPLE_RATE}`, {}, 'AudioService');
-      this.callbacks.onAudioData(base64Data, this.TARGET_SAMPLE_RATE);
+      // Send each chunk immediately (like standalone) as raw PCM at 16kHz input rate
+      logger.debug(`Sending audio chunk: ${pcmData.byteLength} bytes, sample rate: ${this.TARGET_SAMPLE_RATE}`, {}, 'AudioService');
+      this.callbacks.onAudioData(pcmData.buffer, this.TARGET_SAMPLE_RATE);
     }
     
     // Keep remaining samples in buffer for next iteration
@@ -304,15 +301,6 @@ export class AudioService {
     }
   }
 
-  private arrayBufferToBase64(buffer: ArrayBuffer): string {
-    const bytes = new Uint8Array(buffer);
-    let binary = '';
-    for (let i = 0; i < bytes.byteLength; i++) {
-      binary += String.fromCharCode(bytes[i]);
-    }
-    return btoa(binary);
-  }
-
   // Stop playback and clear the queue (like standalone)
   public stopPlayback(): void {
     logger.info('Stopping playback and clearing audio queue', {}, 'AudioService');
@@ -325,8 +313,8 @@ export class AudioService {
   }
 
   // Queue audio for playback (like standalone)
-  public async playAudio(audioData: string, mimeType: string): Promise<void> {
-    logger.debug('Queueing audio data for playback', { length: audioData.length, mimeType }, 'AudioService');
+  public async playAudio(audioData: ArrayBuffer, mimeType: string): Promise<void> {
+    logger.debug('Queueing audio data for playback', { byteLength: audioData.byteLength, mimeType }, 'AudioService');
     try {
       if (!this.audioContext) {
         // Initialize if it's somehow not ready
@@ -342,15 +330,8 @@ export class AudioService {
         await this.audioContext.resume();
       }
 
-      const binaryString = atob(audioData);
-      const len = binaryString.length;
-      const bytes = new Uint8Array(len);
-      for (let i = 0; i < len; i++) {
-        bytes[i] = binaryString.charCodeAt(i);
-      }
-      
-      // Create the AudioBuffer from the raw data
-      const audioBuffer = await this.createAudioBuffer(bytes.buffer, mimeType);
+      // Create the AudioBuffer straight from the binary frame - no base64 decode
+      const audioBuffer = await this.createAudioBuffer(audioData, mimeType);
       
       // Add the processed buffer to our queue
       this.audioQueue.push(audioBuffer);
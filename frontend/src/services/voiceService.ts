@@ -10,11 +10,13 @@ export interface VoiceConfig {
   allowInterruptions: boolean;
   mode: 'study' | 'wellness';
   vad_enabled?: boolean; // Add VAD control flag
+  sampleRate?: number; // Sample rate of binary PCM audio frames
 }
 
 export interface VoiceMessage {
-  type: 'config' | 'audio' | 'text' | 'status' | 'error';
+  type: 'config' | 'audio' | 'audio_start' | 'text' | 'status' | 'error';
   data?: string;
+  audio?: ArrayBuffer; // Raw PCM from a binary frame (type 'audio')
   text?: string;
   status?: 'config_received' | 'connected' | 'listening' | 'thinking' | 'speaking' | 'idle' | 'disconnected';
   config?: VoiceConfig;
@@ -28,6 +30,7 @@ export class VoiceService {
   private onMessage: (message: VoiceMessage) => void;
   private onStatusChange: (status: string) => void;
   private onError: (error: string) => void;
+  private audioMimeType = 'audio/pcm;rate=24000'; // Format of incoming binary audio, set by audio_start
 
   constructor(
     onMessage: (message: VoiceMessage) => void,
@@ -47,6 +50,7 @@ export class VoiceService {
         const wsUrl = `${protocol}//${window.location.host}/ws/${this.clientId}`;
         
         this.ws = new WebSocket(wsUrl);
+        this.ws.binaryType = 'arraybuffer';
 
         this.ws.onopen = () => {
           logger.info('WebSocket connected successfully', { clientId: this.clientId }, 'VoiceService');
@@ -59,8 +63,17 @@ export class VoiceService {
         };
 
         this.ws.onmessage = (event) => {
+          // Binary frames are raw PCM in the format announced by the last audio_start message
+          if (event.data instanceof ArrayBuffer) {
+            this.onMessage({ type: 'audio', audio: event.data, mimeType: this.audioMimeType });
+            return;
+          }
           try {
             const message: VoiceMessage = JSON.parse(event.data);
+            if (message.type === 'audio_start') {
+              this.audioMimeType = message.mimeType || this.audioMimeType;
+              return;
+            }
             logger.debug('WebSocket message received', { type: message.type, status: message.status }, 'VoiceService');
             this.onMessage(message);
             
@@ -103,16 +116,14 @@ export class VoiceService {
     }
   }
 
-  sendAudio(audioData: string, sampleRate: number = 16000): void {
-    logger.debug('Sending audio data', { 
-      dataLength: audioData.length, 
-      sampleRate 
-    }, 'VoiceService');
-    this.send({
-      type: 'audio',
-      data: audioData,
-      sampleRate: sampleRate
-    });
+  sendAudio(audioData: ArrayBuffer): void {
+    // Raw PCM goes out as a binary frame - no base64 or JSON wrapping
+    if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      logger.debug('Sending audio data', { byteLength: audioData.byteLength }, 'VoiceService');
+      this.ws.send(audioData);
+    } else {
+      logger.warn('WebSocket not connected, cannot send audio', {}, 'VoiceService');
+    }
   }
 
   disconnect(): void {
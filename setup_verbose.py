@@ -91,7 +91,7 @@ def setup_backend_verbose():
     
     # Install dependencies with verbose output
     print("\n📦 Installing Python dependencies...")
-    print("This may take several minutes for large packages like PyTorch...")
+    print("This may take several minutes for large packages like SciPy and ONNX Runtime...")
     pip_cmd = f"venv/bin/{python_cmd} -m pip" if os.name != 'nt' else f"venv\\Scripts\\{python_cmd}.exe -m pip"
     
     # Install dependencies from requirements.txt
@@ -108,8 +108,10 @@ def setup_backend_verbose():
             "python-dotenv",
             "numpy",
             "scipy",
-            "torch",
-            "torchaudio"
+            "onnxruntime",
+            "orjson",
+            "msgspec",
+            "pybase64"
         ]
         
         for dep in core_deps:
@@ -196,7 +198,7 @@ def main():
     print("🚀 Setting up Sahay Full-Stack Voice Agent Application")
     print("=" * 60)
     print("This script will show real-time progress during installation")
-    print("Large packages like PyTorch may take 5-10 minutes to download")
+    print("Large packages like SciPy and ONNX Runtime may take a few minutes to download")
     print("=" * 60)
     
     # Check system requirements
@@ -234,7 +236,6 @@ def main():
     print("\n🔧 Troubleshooting:")
     print("- If PyAudio fails, install system audio libraries first")
     print("- If VAD model download fails, check your internet connection")
-    print("- For GPU acceleration, install CUDA-compatible PyTorch")
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,104 @@
 import asyncio
 import os
+import time
 import json
-import base64
+import threading
 import pyaudio
+import msgspec
+from typing import List, Optional
 from websockets import connect
 from concurrent.futures import CancelledError
 
+try:
+    import uvloop
+    # libuv-backed event loop for the client's asyncio.run (uvloop is not available on Windows)
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+try:
+    # SIMD-accelerated codec with the same API as the stdlib base64 module
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+try:
+    import orjson
+
+    def json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    # orjson is optional; fall back to the stdlib encoder
+    json_dumps = json.dumps
+
 from google.genai.types import (GoogleSearch,Tool, GenerateContentConfig)
 
 from voice_activity_detector import VoiceActivityDetector
 
 google_search_tool = Tool(google_search=GoogleSearch())
 
+# Only the fields read from Gemini responses; msgspec skips everything else in the payload
+class InlineData(msgspec.Struct):
+    data: bytes  # base64 in the JSON, decoded by msgspec
+
+class Part(msgspec.Struct):
+    inlineData: Optional[InlineData] = None
+    text: Optional[str] = None
+
+class ModelTurn(msgspec.Struct):
+    parts: List[Part] = []
+
+class ServerContent(msgspec.Struct):
+    modelTurn: Optional[ModelTurn] = None
+    turnComplete: bool = False
+
+class GeminiResponse(msgspec.Struct):
+    serverContent: Optional[ServerContent] = None
+
+response_decoder = msgspec.json.Decoder(GeminiResponse)
+
+# realtime_input message pieces around the base64 chunks; base64 needs no JSON escaping,
+# so batches are assembled by string joins instead of the JSON encoder
+REALTIME_INPUT_PREFIX = '{"realtime_input":{"media_chunks":[{"data":"'
+REALTIME_INPUT_SEPARATOR = '","mime_type":"audio/pcm"},{"data":"'
+REALTIME_INPUT_SUFFIX = '","mime_type":"audio/pcm"}]}}'
+
+class AudioRingBuffer:
+    """Fixed-size byte ring written by the event loop and read by PortAudio's callback thread."""
+
+    def __init__(self, capacity):
+        self._buffer = bytearray(capacity)
+        self._capacity = capacity
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        """Copy as much of data as fits and return the number of bytes written."""
+        with self._lock:
+            n = min(len(data), self._capacity - self._size)
+            end = (self._start + self._size) % self._capacity
+            first = min(n, self._capacity - end)
+            self._buffer[end:end + first] = data[:first]
+            self._buffer[:n - first] = data[first:n]
+            self._size += n
+            return n
+
+    def read(self, n):
+        """Take up to n buffered bytes, padded with silence to exactly n."""
+        out = bytearray(n)
+        with self._lock:
+            m = min(n, self._size)
+            first = min(m, self._capacity - self._start)
+            out[:first] = self._buffer[self._start:self._start + first]
+            out[first:m] = self._buffer[:m - first]
+            self._start = (self._start + m) % self._capacity
+            self._size -= m
+        return bytes(out)
+
 class AwaazConnection:
     def __init__(self, config=None, cleanup_event=None, on_connect=None):
         self.api_key = os.environ.get("GEMINI_API_KEY")
@@ -37,12 +124,37 @@ class AwaazConnection:
         self.INPUT_RATE = 16000
         self.OUTPUT_RATE = 24000
         self.CHUNK = 512
+        # Outbound chunks are sent together: up to SEND_BATCH_CHUNKS per message, held at most SEND_BATCH_SECONDS
+        self.SEND_BATCH_CHUNKS = 4
+        self.SEND_BATCH_SECONDS = 0.1
+
+        # Raw chunks are run through the VAD in groups of VAD_GROUP_CHUNKS
+        self.VAD_GROUP_CHUNKS = 3
+        # Silence keeps streaming for SILENCE_HANGOVER_SECONDS after speech so Gemini can detect the
+        # end of the turn; after that only one silent chunk goes out every SILENCE_KEEPALIVE_SECONDS
+        self.SILENCE_HANGOVER_SECONDS = 1.0
+        self.SILENCE_KEEPALIVE_SECONDS = 1.0
+
+        self._pending_chunks = []
+        self._pending_since = 0.0
+        self._vad_chunks = []
+        self._last_speech_at = 0.0
+        self._last_keepalive_at = 0.0
 
-        self.audio_queue = asyncio.Queue()
+        # Silence sent in place of non-speech chunks (16-bit samples), pre-encoded once
+        self._silence = bytes(self.CHUNK * 2)
+        self._silence_b64 = base64.b64encode(self._silence).decode("utf-8")
+
+        # Bounded so a burst from the server waits for playback instead of growing memory
+        self.audio_queue = asyncio.Queue(maxsize=64)
 
         self.is_playing = False
         self.running = True
+        # Console notices are printed once per stretch of silence / skipped input
+        self._printed_no_speech = False
+        self._printed_skip_message = False
         self.cleanup_event = cleanup_event
+        self._stop_requested = None  # asyncio.Event mirroring cleanup_event, created on the client's loop
         self.on_connect = on_connect
         self.allow_interruptions = config.get("allow_interruptions", False)
 
@@ -60,6 +172,7 @@ class AwaazConnection:
 
     async def start(self):
         """Create a WebSocket connection and run the capture, streaming, and playback tasks concurrently."""
+        loop = asyncio.get_running_loop()
         try:
             self.ws = await connect(self.uri, additional_headers={"Content-Type": "application/json"})
             
@@ -89,7 +202,7 @@ class AwaazConnection:
                 }
             }
 
-            await self.ws.send(json.dumps(setup_message))
+            await self.ws.send(json_dumps(setup_message))
             
             # Wait for setup completion
             await self.ws.recv()
@@ -97,16 +210,32 @@ class AwaazConnection:
             print("Connected to Awaaz. Speak into your microphone.")
             
             if self.on_connect:
-                asyncio.get_event_loop().call_soon_threadsafe(self.on_connect)
+                # Already on the client's loop thread, so no thread-safe handoff is needed
+                loop.call_soon(self.on_connect)
             
-            # Run all tasks concurrently
-            await asyncio.gather(
-                self.capture_audio(),
-                self.receive_server_messages(),
-                self.play_responses(),
-                self.watch_cleanup(),
-                return_exceptions=True
-            )
+            # Forward the GUI thread's stop request onto this loop without polling
+            self._stop_requested = asyncio.Event()
+            if self.cleanup_event is not None:
+                threading.Thread(
+                    target=self._forward_cleanup_event,
+                    args=(loop,),
+                    daemon=True
+                ).start()
+
+            # Run all tasks concurrently; the first to finish (stop requested, server closed,
+            # capture failed) ends the session and the rest are cancelled
+            tasks = [
+                asyncio.create_task(self.capture_audio()),
+                asyncio.create_task(self.receive_server_messages()),
+                asyncio.create_task(self.play_responses()),
+                asyncio.create_task(self.watch_cleanup()),
+            ]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
         except Exception as e:
             print(f"Error in Awaaz connection: {e}")
@@ -117,18 +246,27 @@ class AwaazConnection:
         """Capture audio from your microphone and send to Awaaz in realtime."""
         audio = pyaudio.PyAudio()
         stream = None
+        loop = asyncio.get_running_loop()
+        captured = asyncio.Queue()
+
+        def on_input(in_data, frame_count, time_info, status):
+            # Runs on PortAudio's callback thread; hand each chunk to the event loop without blocking
+            loop.call_soon_threadsafe(captured.put_nowait, in_data)
+            return (None, pyaudio.paContinue)
+
         try:
             stream = audio.open(
                 format=self.FORMAT,
                 channels=self.CHANNELS,
                 rate=self.INPUT_RATE,
                 input=True,
-                frames_per_buffer=self.CHUNK
+                frames_per_buffer=self.CHUNK,
+                stream_callback=on_input
             )
 
             while self.running:
                 try:
-                    data = await asyncio.to_thread(stream.read, self.CHUNK, exception_on_overflow=False)
+                    data = await captured.get()
                     
                     if self.equalizer:
                         self.equalizer.update_levels(data)
@@ -136,28 +274,15 @@ class AwaazConnection:
                     should_process = (not self.is_playing) or (self.is_playing and self.allow_interruptions)
 
                     if should_process:
-                        if not self.vad.is_speech(data):
-                            if not hasattr(self, '_printed_no_speech'):
-                                print("No speech detected")
-                                self._printed_no_speech = True
-                            data = b'\x00' * len(data)
-                        else:
-                            self._printed_no_speech = False
-                        
-                        encoded_data = base64.b64encode(data).decode("utf-8")
-                        realtime_input_msg = {
-                            "realtime_input": {
-                                "media_chunks": [
-                                    {
-                                        "data": encoded_data,
-                                        "mime_type": "audio/pcm"
-                                    }
-                                ]
-                            }
-                        }
-                        await self.ws.send(json.dumps(realtime_input_msg))
+                        # The VAD decides once per group of chunks
+                        self._vad_chunks.append(data)
+                        if len(self._vad_chunks) >= self.VAD_GROUP_CHUNKS:
+                            await self.process_vad_group()
                     else:
-                        if not hasattr(self, '_printed_skip_message'):
+                        # Don't hold back audio captured before Awaaz started speaking
+                        await self.process_vad_group()
+                        await self.send_pending_chunks()
+                        if not self._printed_skip_message:
                             print("Skipping input while Awaaz is speaking")
                             self._printed_skip_message = True
                         elif not self.is_playing:
@@ -184,51 +309,123 @@ class AwaazConnection:
             except Exception:
                 pass
 
+    async def process_vad_group(self):
+        """Run the VAD once over the buffered chunks and queue them (or silence) for sending."""
+        if not self._vad_chunks:
+            return
+        chunks, self._vad_chunks = self._vad_chunks, []
+
+        speech = self.vad.is_speech(b"".join(chunks))
+        if not speech:
+            if not self._printed_no_speech:
+                print("No speech detected")
+                self._printed_no_speech = True
+        else:
+            self._printed_no_speech = False
+
+        now = time.monotonic()
+        if speech:
+            self._last_speech_at = now
+        elif now - self._last_speech_at > self.SILENCE_HANGOVER_SECONDS:
+            # Long silence: don't hold back the tail of the last utterance, then send
+            # nothing but a periodic keepalive
+            await self.send_pending_chunks()
+            if now - self._last_keepalive_at < self.SILENCE_KEEPALIVE_SECONDS:
+                return
+            self._last_keepalive_at = now
+            chunks = chunks[:1]
+
+        for data in chunks:
+            if not speech:
+                # Captured chunks are always CHUNK samples, so silence is one cached payload
+                if len(data) == len(self._silence):
+                    encoded_data = self._silence_b64
+                else:
+                    encoded_data = base64.b64encode(bytes(len(data))).decode("utf-8")
+            else:
+                encoded_data = base64.b64encode(data).decode("utf-8")
+
+            if not self._pending_chunks:
+                self._pending_since = time.monotonic()
+            self._pending_chunks.append(encoded_data)
+            if (len(self._pending_chunks) >= self.SEND_BATCH_CHUNKS
+                    or time.monotonic() - self._pending_since >= self.SEND_BATCH_SECONDS):
+                await self.send_pending_chunks()
+
+    async def send_pending_chunks(self):
+        """Send all batched audio chunks to Awaaz in one realtime_input message."""
+        if not self._pending_chunks:
+            return
+        realtime_input_msg = (
+            REALTIME_INPUT_PREFIX
+            + REALTIME_INPUT_SEPARATOR.join(self._pending_chunks)
+            + REALTIME_INPUT_SUFFIX
+        )
+        self._pending_chunks = []
+        await self.ws.send(realtime_input_msg)
+
     async def receive_server_messages(self):
         async for msg in self.ws:
-            response = json.loads(msg)
-            
-            # If the server gave us audio data, store it for playback
             try:
-                parts = response["serverContent"]["modelTurn"]["parts"]
-                for p in parts:
-                    if "inlineData" in p:
+                server_content = response_decoder.decode(msg).serverContent
+            except (msgspec.ValidationError, msgspec.DecodeError):
+                # Skip frames that don't match the expected shape rather than end the session
+                continue
+            if server_content is None:
+                continue
+
+            # If the server gave us audio data, store it for playback
+            if server_content.modelTurn is not None:
+                for p in server_content.modelTurn.parts:
+                    if p.inlineData is not None:
                         # This indicates audio data
-                        audio_data_b64 = p["inlineData"]["data"]
-                        audio_bytes = base64.b64decode(audio_data_b64)
-                        self.audio_queue.put_nowait(audio_bytes)
-                    elif "text" in p:
+                        await self.audio_queue.put(p.inlineData.data)
+                    elif p.text is not None:
                         # If the model also responds with text, you can process it here
-                        print("Awaaz text response:", p["text"])
-            except KeyError:
-                pass
+                        print("Awaaz text response:", p.text)
 
             # Check if the model ended its turn
-            try:
-                turn_complete = response["serverContent"]["turnComplete"]
-                if turn_complete:
-                    # If the user interrupts or the turn is done, any leftover audio is ignored or cleared.
-                    while not self.audio_queue.empty():
-                        self.audio_queue.get_nowait()
-            except KeyError:
-                pass
+            if server_content.turnComplete:
+                # If the user interrupts or the turn is done, any leftover audio is ignored or cleared.
+                while not self.audio_queue.empty():
+                    self.audio_queue.get_nowait()
 
     async def play_responses(self):
         """Pull audio data from the queue and play it through speakers."""
         audio = pyaudio.PyAudio()
+        loop = asyncio.get_running_loop()
+        # Half a second of 16-bit output; the stream callback pulls from it on PortAudio's thread
+        ring = AudioRingBuffer(self.OUTPUT_RATE)
+
+        def on_playback_drained():
+            if not ring and self.audio_queue.empty():
+                self.is_playing = False
+
+        def on_output(in_data, frame_count, time_info, status):
+            had_audio = len(ring) > 0
+            out = ring.read(frame_count * 2)
+            if had_audio and not ring:
+                loop.call_soon_threadsafe(on_playback_drained)
+            return (out, pyaudio.paContinue)
+
         stream = audio.open(
             format=self.FORMAT,
             channels=self.CHANNELS,
             rate=self.OUTPUT_RATE,
-            output=True
+            output=True,
+            frames_per_buffer=self.CHUNK,
+            stream_callback=on_output
         )
 
         try:
             while self.running:
-                audio_chunk = await self.audio_queue.get()
+                audio_chunk = memoryview(await self.audio_queue.get())
                 self.is_playing = True
-                await asyncio.to_thread(stream.write, audio_chunk)
-                self.is_playing = False
+                while audio_chunk:
+                    audio_chunk = audio_chunk[ring.write(audio_chunk):]
+                    if audio_chunk:
+                        # Ring is full; wait for the callback to play some of it
+                        await asyncio.sleep(0.02)
         except CancelledError:
             print("Playback cancelled")
         except Exception as e:
@@ -238,10 +435,15 @@ class AwaazConnection:
             stream.close()
             audio.terminate()
 
+    def _forward_cleanup_event(self, loop):
+        """Block on the main thread's cleanup event, then wake watch_cleanup on the client's loop."""
+        self.cleanup_event.wait()
+        try:
+            loop.call_soon_threadsafe(self._stop_requested.set)
+        except RuntimeError:
+            pass  # The session already ended and its loop is closed
+
     async def watch_cleanup(self):
         """Watch for cleanup event from main thread"""
-        while self.running:
-            if self.cleanup_event.is_set():
-                self.running = False
-                break
-            await asyncio.sleep(0.1)
+        await self._stop_requested.wait()
+        self.running = False
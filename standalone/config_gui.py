@@ -4,9 +4,49 @@ import tkinter as tk
 from tkinter import ttk
 import tkinter.scrolledtext as scrolledtext
 import threading
+import queue
+import time
 
 from awaaz_connection import AwaazConnection
 
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional; the NumPy kernel below is used without it
+    njit = None
+
+def bar_heights(audio_np, bars, height):
+    """Pixel height of each equalizer bar from the RMS of its share of int16 audio"""
+    # One (bars, samples_per_bar) view of the audio; samples past an even split are dropped
+    per_bar = len(audio_np) // bars
+    segments = audio_np[:per_bar * bars].reshape(bars, per_bar)
+    
+    # Sum of squares for every bar in one pass, accumulated as int64 (int16 squares overflow int32 sums)
+    sum_squares = np.einsum('ij,ij->i', segments, segments, dtype=np.int64)
+    
+    # RMS normalized to 0-1 range and scaled to height
+    rms = np.sqrt(sum_squares / per_bar)
+    return np.clip((rms * (height * 7 / 32768.0)).astype(np.int32), 0, height)
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def bar_heights(audio_np, bars, height):
+        """Pixel height of each equalizer bar, as a single compiled loop with no temporaries"""
+        per_bar = len(audio_np) // bars
+        heights = np.empty(bars, dtype=np.int32)
+        for i in range(bars):
+            sum_squares = 0
+            for j in range(i * per_bar, (i + 1) * per_bar):
+                sample = np.int64(audio_np[j])
+                sum_squares += sample * sample
+            rms = np.sqrt(sum_squares / per_bar)
+            heights[i] = min(int(rms / 32768.0 * height * 7), height)
+        return heights
+
+    # Compile now rather than on the first audio chunk; update_levels passes read-only
+    # frombuffer views, which numba compiles separately from writable arrays
+    bar_heights(np.frombuffer(bytes(1024), dtype=np.int16), 10, 60)
+
 class VoiceEqualizer(tk.Canvas):
     def __init__(self, parent, width=200, height=60, bars=10):
         super().__init__(parent, width=width, height=height, bg='black')
@@ -14,53 +54,105 @@ class VoiceEqualizer(tk.Canvas):
         self.bar_width = width // bars
         self.height = height
         self.rectangles = []
+        # Left/right x of every bar, fixed for the life of the widget
+        self._x0 = [i * self.bar_width for i in range(bars)]
+        self._x1 = [x + self.bar_width - 1 for x in self._x0]
         
         # Create bars
-        for i in range(bars):
-            x = i * self.bar_width
+        for x0, x1 in zip(self._x0, self._x1):
             rect = self.create_rectangle(
-                x, height,
-                x + self.bar_width - 1, height,
+                x0, height,
+                x1, height,
                 fill='green'
             )
             self.rectangles.append(rect)
         
         self.is_animating = False
+        # Bars are redrawn at most once per FRAME_MS from the latest computed levels
+        self.FRAME_MS = 33
+        # Heights computed on the audio thread; holds only the newest set
+        self._levels = queue.Queue(maxsize=1)
+        # Monotonic time before which new chunks are skipped instead of computed
+        self._next_levels_at = 0.0
+        self._redraw_job = None
+        # Height currently drawn for each bar, so unchanged bars skip the Tk call
+        self._drawn_heights = [0] * bars
 
     def update_levels(self, audio_data):
-        """Update bars based on actual audio levels"""
+        """Compute bar heights on the calling (audio) thread; the next frame draws the newest"""
         if not self.is_animating:
             return
+        
+        # Compute at most one set of levels per frame; the rest would never be drawn
+        now = time.monotonic()
+        if now < self._next_levels_at:
+            return
+        self._next_levels_at = max(self._next_levels_at + self.FRAME_MS / 1000, now)
             
         # Convert bytes to numpy array
         audio_np = np.frombuffer(audio_data, dtype=np.int16)
+        if len(audio_np) < self.bars:
+            return
+        heights = bar_heights(audio_np, self.bars, self.height).tolist()
         
-        # Split audio into segments for each bar
-        segments = np.array_split(audio_np, self.bars)
-        
-        # Calculate RMS for each segment and normalize
-        for i, segment in enumerate(segments):
-            rms = np.sqrt(np.mean(segment.astype(float)**2))
-            # Normalize to 0-1 range and scale to height
-            height = min(int((rms / 32768.0) * self.height * 7), self.height)
-            
-            # Update bar height
-            self.coords(
-                self.rectangles[i],
-                i * self.bar_width, self.height - height,
-                (i + 1) * self.bar_width - 1, self.height
-            )
+        # Replace levels the Tk thread hasn't drawn yet so the latest always wins
+        try:
+            self._levels.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._levels.put_nowait(heights)
+        except queue.Full:
+            pass
+
+    def _redraw(self):
+        """Update bars based on actual audio levels, then schedule the next frame"""
+        self._redraw_job = None
+        if not self.is_animating:
+            return
+        try:
+            heights = self._levels.get_nowait()
+        except queue.Empty:
+            heights = None
+        if heights is not None:
+            for i, height in enumerate(heights):
+                if height == self._drawn_heights[i]:
+                    continue
+                self._drawn_heights[i] = height
+                # Update bar height
+                self.coords(
+                    self.rectangles[i],
+                    self._x0[i], self.height - height,
+                    self._x1[i], self.height
+                )
+        self._redraw_job = self.after(self.FRAME_MS, self._redraw)
 
     def start_animation(self):
         self.is_animating = True
+        if self._redraw_job is None:
+            self._redraw_job = self.after(self.FRAME_MS, self._redraw)
 
     def stop_animation(self):
         self.is_animating = False
+        if self._redraw_job is not None:
+            self.after_cancel(self._redraw_job)
+            self._redraw_job = None
+        try:
+            self._levels.get_nowait()
+        except queue.Empty:
+            pass
+        # Reset on Tk's own thread, coalesced with its next redraw
+        self.after_idle(self._reset_bars)
+
+    def _reset_bars(self):
+        if self.is_animating:
+            return
+        self._drawn_heights = [0] * self.bars
         # Reset all bars
-        for rect in self.rectangles:
+        for rect, x0, x1 in zip(self.rectangles, self._x0, self._x1):
             self.coords(rect, 
-                self.coords(rect)[0], self.height,
-                self.coords(rect)[2], self.height
+                x0, self.height,
+                x1, self.height
             )
 
 class ConfigGUI:
@@ -115,13 +207,20 @@ class ConfigGUI:
         self.equalizer = VoiceEqualizer(self.root)
         self.equalizer.pack(pady=20)
 
+        # One Tcl script per state so toggling every config widget is a single round trip
+        self._config_state_scripts = {
+            state: "\n".join([
+                f"{self.system_prompt} configure -state {state}",
+                f"{self.voice_dropdown} configure -state {'readonly' if state == 'normal' else 'disabled'}",
+                f"{self.google_search_cb} configure -state {state}",
+                f"{self.interruptions_cb} configure -state {state}",
+            ])
+            for state in ("normal", "disabled")
+        }
 
     def set_config_state(self, state):
         """Enable or disable all configuration widgets"""
-        self.system_prompt.config(state=state)
-        self.voice_dropdown.config(state="readonly" if state == "normal" else "disabled")
-        self.google_search_cb.config(state=state)
-        self.interruptions_cb.config(state=state)
+        self.root.tk.eval(self._config_state_scripts[state])
 
     def get_config(self):
         return {
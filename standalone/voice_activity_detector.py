@@ -10,15 +10,18 @@ class VoiceActivityDetector:
         self.model.eval()
 
     def is_speech(self, audio_data: bytes) -> bool:
+        """True if any 512-sample frame of 16kHz audio in `audio_data` is speech"""
         # Convert raw bytes directly to numpy array of int16
         audio_np = np.frombuffer(audio_data, dtype=np.int16)
         
         # Convert to float32 and normalize to [-1, 1]
         audio_float = audio_np.astype(np.float32) / 32768.0
         
-        # Convert to torch tensor
-        audio_tensor = torch.from_numpy(audio_float)
+        # Convert to torch tensor, one row per model frame
+        frames = torch.from_numpy(audio_float).view(-1, 512)
         
-        # Get speech probability
-        speech_prob = self.model(audio_tensor, 16000).item()
-        return speech_prob > 0.8  # Adjust threshold as needed
\ No newline at end of file
+        # Get speech probability for every frame in order, so the model's recurrent
+        # state still advances through all of the audio
+        with torch.no_grad():
+            speech_probs = [self.model(frame, 16000).item() for frame in frames]
+        return max(speech_probs) > 0.8  # Adjust threshold as needed
\ No newline at end of file
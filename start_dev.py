@@ -9,6 +9,7 @@ import sys
 import time
 import signal
 import os
+import threading
 from pathlib import Path
 
 class DevServer:
@@ -17,6 +18,19 @@ class DevServer:
         self.frontend_process = None
         self.running = True
 
+    def _drain_output(self, process):
+        """Forward a child's output to our stdout so its pipe never fills and blocks it"""
+        fd = process.stdout.fileno()
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+
+    def _start_output_reader(self, process):
+        threading.Thread(target=self._drain_output, args=(process,), daemon=True).start()
+
     def start_backend(self):
         """Start the backend server"""
         print("🚀 Starting backend server...")
@@ -33,10 +47,9 @@ class DevServer:
                 [str(venv_python), "main.py"],
                 cwd=backend_dir,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+                stderr=subprocess.STDOUT
             )
+            self._start_output_reader(self.backend_process)
             
             # Wait a moment to see if backend starts successfully
             time.sleep(2)
@@ -61,10 +74,9 @@ class DevServer:
                 ["npm", "run", "dev"],
                 cwd=frontend_dir,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+                stderr=subprocess.STDOUT
             )
+            self._start_output_reader(self.frontend_process)
             
             # Wait a moment to see if frontend starts successfully
             time.sleep(3)
@@ -105,6 +117,37 @@ class DevServer:
         
         print("✅ Cleanup complete")
 
+    def wait_for_exit(self):
+        """Block until a child exits; WNOWAIT leaves it for Popen to reap in cleanup()"""
+        while self.running:
+            try:
+                exited = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOWAIT)
+            except ChildProcessError:
+                break
+            if not self.running:
+                break
+            
+            if exited.si_pid == self.backend_process.pid:
+                print("❌ Backend process died unexpectedly")
+            elif exited.si_pid == self.frontend_process.pid:
+                print("❌ Frontend process died unexpectedly")
+            break
+
+    def poll_for_exit(self):
+        """Check both processes once a second until one exits"""
+        while self.running:
+            # Check if backend is still running
+            if self.backend_process and self.backend_process.poll() is not None:
+                print("❌ Backend process died unexpectedly")
+                break
+            
+            # Check if frontend is still running
+            if self.frontend_process and self.frontend_process.poll() is not None:
+                print("❌ Frontend process died unexpectedly")
+                break
+            
+            time.sleep(1)
+
     def run(self):
         """Run both servers"""
         # Set up signal handlers
@@ -144,19 +187,11 @@ class DevServer:
         print("=" * 60)
         
         try:
-            # Monitor processes
-            while self.running:
-                # Check if backend is still running
-                if self.backend_process and self.backend_process.poll() is not None:
-                    print("❌ Backend process died unexpectedly")
-                    break
-                
-                # Check if frontend is still running
-                if self.frontend_process and self.frontend_process.poll() is not None:
-                    print("❌ Frontend process died unexpectedly")
-                    break
-                
-                time.sleep(1)
+            # Kernel-driven wait where available (os.waitid is missing on macOS before Python 3.13)
+            if hasattr(os, "waitid"):
+                self.wait_for_exit()
+            else:
+                self.poll_for_exit()
                 
         except KeyboardInterrupt:
             pass
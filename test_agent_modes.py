@@ -6,6 +6,9 @@ Test script to verify both study and wellness agent modes work correctly
 import requests
 import json
 
+# Shared across tests so the connection to the backend is kept alive and reused
+session = requests.Session()
+
 def test_agent_modes():
     """Test that both agent modes are properly configured"""
     print("🧪 Testing Agent Modes Configuration")
@@ -13,7 +16,7 @@ def test_agent_modes():
     
     try:
         # Test the agent modes endpoint
-        response = requests.get("http://localhost:8000/api/agent-modes")
+        response = session.get("http://localhost:8000/api/agent-modes")
         if response.status_code != 200:
             print(f"❌ Failed to get agent modes: {response.status_code}")
             return False
@@ -86,7 +89,7 @@ def test_health():
     print("-" * 30)
     
     try:
-        response = requests.get("http://localhost:8000/health")
+        response = session.get("http://localhost:8000/health")
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Backend is healthy: {data}")
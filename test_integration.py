@@ -2,25 +2,37 @@
 """
 Integration test script for Sahay Full-Stack Voice Agent Application
 Tests the backend API endpoints and WebSocket connectivity
+Requires httpx in addition to the backend requirements: pip install -r backend/requirements-dev.txt
 """
 
-import requests
+import httpx
 import websockets
 import json
 import asyncio
 import sys
 from pathlib import Path
 
+# Serialized once; sent as a text frame since the backend reads config with receive_text
+CONFIG_MESSAGE = json.dumps({
+    "type": "config",
+    "config": {
+        "systemPrompt": "You are a test AI assistant.",
+        "voice": "Puck",
+        "googleSearch": False,
+        "allowInterruptions": False
+    }
+})
+
 class IntegrationTester:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.ws_url = base_url.replace("http", "ws")
 
-    async def test_health_endpoint(self):
+    async def test_health_endpoint(self, client):
         """Test the health check endpoint"""
         print("🔍 Testing health endpoint...")
         try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
+            response = await client.get("/health")
             if response.status_code == 200:
                 data = response.json()
                 print(f"✅ Health check passed: {data}")
@@ -32,11 +44,11 @@ class IntegrationTester:
             print(f"❌ Health check error: {e}")
             return False
 
-    async def test_voices_endpoint(self):
+    async def test_voices_endpoint(self, client):
         """Test the voices API endpoint"""
         print("🔍 Testing voices endpoint...")
         try:
-            response = requests.get(f"{self.base_url}/api/voices", timeout=5)
+            response = await client.get("/api/voices")
             if response.status_code == 200:
                 data = response.json()
                 print(f"✅ Voices endpoint passed: {data}")
@@ -57,17 +69,7 @@ class IntegrationTester:
             
             async with websockets.connect(uri) as websocket:
                 # Send configuration
-                config_message = {
-                    "type": "config",
-                    "config": {
-                        "systemPrompt": "You are a test AI assistant.",
-                        "voice": "Puck",
-                        "googleSearch": False,
-                        "allowInterruptions": False
-                    }
-                }
-                
-                await websocket.send(json.dumps(config_message))
+                await websocket.send(CONFIG_MESSAGE)
                 print("✅ WebSocket connection established and config sent")
                 
                 # Wait for a response (with timeout)
@@ -83,11 +85,11 @@ class IntegrationTester:
             print(f"❌ WebSocket connection error: {e}")
             return False
 
-    async def test_frontend_serving(self):
+    async def test_frontend_serving(self, client):
         """Test if frontend is being served"""
         print("🔍 Testing frontend serving...")
         try:
-            response = requests.get(f"{self.base_url}/", timeout=5)
+            response = await client.get("/")
             if response.status_code == 200:
                 content = response.text
                 if "Sahay" in content or "React" in content or "index.html" in content:
@@ -108,22 +110,24 @@ class IntegrationTester:
         print("🧪 Running Sahay Integration Tests")
         print("=" * 50)
         
-        tests = [
-            ("Health Endpoint", self.test_health_endpoint()),
-            ("Voices Endpoint", self.test_voices_endpoint()),
-            ("WebSocket Connection", self.test_websocket_connection()),
-            ("Frontend Serving", self.test_frontend_serving()),
-        ]
+        # One pooled keep-alive client shared by the HTTP tests, which run concurrently
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=5) as client:
+            tests = [
+                ("Health Endpoint", self.test_health_endpoint(client)),
+                ("Voices Endpoint", self.test_voices_endpoint(client)),
+                ("WebSocket Connection", self.test_websocket_connection()),
+                ("Frontend Serving", self.test_frontend_serving(client)),
+            ]
+            outcomes = await asyncio.gather(
+                *(test_coro for _, test_coro in tests), return_exceptions=True
+            )
         
         results = []
-        for test_name, test_coro in tests:
-            print(f"\n📋 {test_name}")
-            try:
-                result = await test_coro
-                results.append((test_name, result))
-            except Exception as e:
-                print(f"❌ {test_name} failed with exception: {e}")
-                results.append((test_name, False))
+        for (test_name, _), result in zip(tests, outcomes):
+            if isinstance(result, Exception):
+                print(f"❌ {test_name} failed with exception: {result}")
+                result = False
+            results.append((test_name, result))
         
         # Summary
         print("\n" + "=" * 50)